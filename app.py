@@ -1,17 +1,20 @@
 """JobFinder MVP — Flask Application."""
 
 import os
-import json
+import orjson
 import logging
+import functools
 import threading
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from flask import Flask, request, jsonify, render_template, send_file
 
 import database as db
+from crawler import detail_cache
 from crawler.workday import parse_workday_url, crawl_company
 from filters.keywords import is_relevant_job, DEFAULT_JOB_TITLES
-from filters.posted_today import is_posted_today
+from filters.posted_today import is_posted_today, reset_today_cache
 from filters.usa import is_usa_job
 from filters.jd_extractors import extract_experience_years, extract_visa_sponsorship
 from matcher.resume_parser import extract_resume_text, parse_sections, extract_skills
@@ -37,6 +40,10 @@ os.makedirs(EXPORT_DIR, exist_ok=True)
 
 # Track active runs for progress reporting
 _active_runs = {}  # run_id -> progress dict
+_active_runs_lock = threading.Lock()  # guards counters/errors updated by company workers
+
+# Number of companies scanned concurrently (detail fetching is parallel within each)
+COMPANY_WORKERS = int(os.environ.get("JOBFINDER_COMPANY_WORKERS", 8))
 
 
 # ── Page Routes ─────────────────────────────────────────────────────
@@ -124,17 +131,26 @@ def get_resume():
 JOB_TITLES_SETTING_KEY = "job_titles"
 
 
-@app.route("/api/job-titles", methods=["GET"])
-def get_job_titles():
-    raw = db.get_setting(JOB_TITLES_SETTING_KEY)
+@functools.lru_cache(maxsize=8)
+def _parse_job_titles(raw):
+    """Decode the stored job-titles JSON. Cached on the raw value, so a save
+    in any worker process is picked up on the next read."""
     if raw:
         try:
-            titles = json.loads(raw)
-        except (json.JSONDecodeError, TypeError):
-            titles = DEFAULT_JOB_TITLES
-    else:
-        titles = DEFAULT_JOB_TITLES
-    return jsonify({"titles": titles})
+            return tuple(orjson.loads(raw))
+        except (orjson.JSONDecodeError, TypeError):
+            pass
+    return tuple(DEFAULT_JOB_TITLES)
+
+
+def _load_job_titles():
+    """Return the configured target job titles (or the defaults)."""
+    return _parse_job_titles(db.get_setting(JOB_TITLES_SETTING_KEY))
+
+
+@app.route("/api/job-titles", methods=["GET"])
+def get_job_titles():
+    return jsonify({"titles": _load_job_titles()})
 
 
 @app.route("/api/job-titles", methods=["POST"])
@@ -150,7 +166,7 @@ def save_job_titles():
     # Filter out empty strings
     titles = [t.strip() for t in titles if t.strip()]
 
-    db.save_setting(JOB_TITLES_SETTING_KEY, json.dumps(titles))
+    db.save_setting(JOB_TITLES_SETTING_KEY, orjson.dumps(titles).decode())
     return jsonify({"success": True, "count": len(titles), "titles": titles})
 
 
@@ -161,36 +177,49 @@ def _scan_one_company(company, run_id, target_titles, resume_text, resume_skills
     company_name = company["company_name"]
     url = company["workday_url"]
 
-    _active_runs[run_id]["phase"] = f"Scanning {company_name}"
+    progress = _active_runs[run_id]
+    progress["current_company"] = company_name
+    progress["phase"] = f"Scanning {company_name}"
 
     try:
         parsed = parse_workday_url(url)
         if not parsed:
             error_msg = f"{company_name}: Invalid Workday URL: {url}"
             logger.warning(error_msg)
-            _active_runs[run_id]["errors"].append(error_msg)
+            with _active_runs_lock:
+                progress["errors"].append(error_msg)
             db.update_company_run_status(company["company_id"], "invalid_url")
             return 0, 0
 
-        host, tenant, site = parsed["host"], parsed["tenant"], parsed["site"]
+        host, tenant, site = parsed.host, parsed.tenant, parsed.site
 
+        # Called once per listings page / detail fetch: store raw counters only
+        # and let run_status() format them when polled.
         def progress_cb(done, total, phase="listings"):
-            _active_runs[run_id]["phase"] = f"{company_name}: {phase} {done}/{total}"
+            progress["current_company"] = company_name
+            progress["phase_name"] = phase
+            progress["phase_done"] = done
+            progress["phase_total"] = total
+            progress["phase"] = None
 
-        # Early title filter: applied BEFORE fetching job details (huge speedup)
         def title_filter(job):
             return is_relevant_job(job, target_titles=target_titles)
 
-        # Crawl company (parallel detail fetching inside, with early title filter)
+        # Crawl company (parallel detail fetching inside, with early title filter
+        # applied BEFORE fetching job details — huge speedup)
         jobs = crawl_company(host, tenant, site, progress_callback=progress_cb,
                              title_filter_fn=title_filter)
         found = len(jobs)
 
-        _active_runs[run_id]["jobs_found"] += found
-        _active_runs[run_id]["phase"] = f"{company_name}: Filtering {found} jobs"
+        with _active_runs_lock:
+            progress["jobs_found"] += found
+        progress["phase"] = f"{company_name}: Filtering {found} jobs"
 
         # Apply filters (cheap, no model needed)
+        # Titles and JD texts are collected alongside, ready for batch scoring
         filtered_jobs = []
+        titles = []
+        jd_texts = []
         date_rejected = 0
         title_rejected = 0
         usa_rejected = 0
@@ -198,7 +227,7 @@ def _scan_one_company(company, run_id, target_titles, resume_text, resume_skills
             if not is_posted_today(job):
                 date_rejected += 1
                 continue
-            if not is_relevant_job(job, target_titles=target_titles):
+            if not title_filter(job):
                 title_rejected += 1
                 continue
             usa, country_guess = is_usa_job(job)
@@ -207,6 +236,8 @@ def _scan_one_company(company, run_id, target_titles, resume_text, resume_skills
                 continue
             job["_country_guess"] = country_guess
             filtered_jobs.append(job)
+            titles.append(job["title"])
+            jd_texts.append(job.get("jd_text", ""))
 
         logger.info(
             f"{company_name}: {len(jobs)} crawled -> "
@@ -218,11 +249,10 @@ def _scan_one_company(company, run_id, target_titles, resume_text, resume_skills
             db.update_company_run_status(company["company_id"], "success")
             return found, 0
 
-        _active_runs[run_id]["phase"] = f"{company_name}: Scoring {len(filtered_jobs)} jobs"
+        progress["phase"] = f"{company_name}: Scoring {len(filtered_jobs)} jobs"
 
         # Batch score all filtered jobs at once
-        score_inputs = [{"title": j["title"], "jd_text": j.get("jd_text", "")} for j in filtered_jobs]
-        score_results = score_jobs_batch(score_inputs, resume_text, resume_skills)
+        score_results = score_jobs_batch(titles, jd_texts, resume_text, resume_skills)
 
         # Build job records for batch DB write
         job_records = []
@@ -252,19 +282,22 @@ def _scan_one_company(company, run_id, target_titles, resume_text, resume_skills
                 "run_id": run_id,
             })
 
-        # Batch write to DB
-        db.upsert_jobs_batch(job_records)
+        # Batch write jobs + company status to DB under a single commit
+        with db.transaction() as conn:
+            db.bulk_insert_jobs(job_records, conn=conn)
+            db.update_company_run_status(company["company_id"], "success", conn=conn)
 
         returned = len(job_records)
-        _active_runs[run_id]["jobs_returned"] += returned
+        with _active_runs_lock:
+            progress["jobs_returned"] += returned
 
-        db.update_company_run_status(company["company_id"], "success")
         return found, returned
 
     except Exception as e:
         error_msg = f"{company_name}: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        _active_runs[run_id]["errors"].append(error_msg)
+        with _active_runs_lock:
+            progress["errors"].append(error_msg)
         db.update_company_run_status(company["company_id"], f"error: {str(e)[:100]}")
         return 0, 0
 
@@ -280,7 +313,10 @@ def _run_scanner(run_id):
         "jobs_found": 0,
         "jobs_returned": 0,
         "errors": [],
-        "phase": "starting",
+        "phase": "starting",  # None while phase_name/phase_done/phase_total are live
+        "phase_name": "",
+        "phase_done": 0,
+        "phase_total": 0,
     }
 
     try:
@@ -291,25 +327,22 @@ def _run_scanner(run_id):
             _active_runs[run_id]["status"] = "error"
             _active_runs[run_id]["phase"] = "No companies loaded"
             db.update_run(run_id, status="error", error_log="No companies loaded",
-                         finished_at=datetime.utcnow().isoformat())
+                         finished_at=db.utc_now())
             return
 
         if not resume:
             _active_runs[run_id]["status"] = "error"
             _active_runs[run_id]["phase"] = "No resume uploaded"
             db.update_run(run_id, status="error", error_log="No resume uploaded",
-                          finished_at=datetime.utcnow().isoformat())
+                          finished_at=db.utc_now())
             return
 
+        # Pin "today" for the whole run and drop detail-cache rows from earlier days
+        reset_today_cache()
+        detail_cache.sweep()
+
         # Load configurable job titles
-        raw_titles = db.get_setting(JOB_TITLES_SETTING_KEY)
-        if raw_titles:
-            try:
-                target_titles = json.loads(raw_titles)
-            except (json.JSONDecodeError, TypeError):
-                target_titles = DEFAULT_JOB_TITLES
-        else:
-            target_titles = DEFAULT_JOB_TITLES
+        target_titles = _load_job_titles()
 
         resume_text = resume["resume_text"]
         resume_skills = resume["skills_list"]
@@ -319,15 +352,19 @@ def _run_scanner(run_id):
         total_found = 0
         total_returned = 0
 
-        # Scan companies sequentially (crawl parallelism is within each company)
-        for ci, company in enumerate(companies):
-            _active_runs[run_id]["current_company"] = company["company_name"]
-            found, returned = _scan_one_company(
-                company, run_id, target_titles, resume_text, resume_skills
-            )
-            total_found += found
-            total_returned += returned
-            _active_runs[run_id]["companies_done"] = ci + 1
+        # Scan companies concurrently; all are submitted before any result is awaited
+        workers = max(1, min(COMPANY_WORKERS, total_companies))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_scan_one_company, company, run_id, target_titles,
+                                resume_text, resume_skills)
+                for company in companies
+            ]
+            for ci, future in enumerate(as_completed(futures)):
+                found, returned = future.result()
+                total_found += found
+                total_returned += returned
+                _active_runs[run_id]["companies_done"] = ci + 1
 
         # Finalize
         _active_runs[run_id]["status"] = "done"
@@ -335,11 +372,11 @@ def _run_scanner(run_id):
         db.update_run(
             run_id,
             status="done",
-            finished_at=datetime.utcnow().isoformat(),
+            finished_at=db.utc_now(),
             total_companies=total_companies,
             total_jobs_found=total_found,
             total_jobs_returned=total_returned,
-            error_log=json.dumps(_active_runs[run_id]["errors"]) if _active_runs[run_id]["errors"] else None,
+            error_log=orjson.dumps(_active_runs[run_id]["errors"]).decode() if _active_runs[run_id]["errors"] else None,
         )
         logger.info(f"Run {run_id} complete: {total_returned} jobs matched from {total_found} found")
 
@@ -348,7 +385,7 @@ def _run_scanner(run_id):
         _active_runs[run_id]["status"] = "error"
         _active_runs[run_id]["phase"] = str(e)
         db.update_run(run_id, status="error", error_log=str(e),
-                     finished_at=datetime.utcnow().isoformat())
+                     finished_at=db.utc_now())
 
 
 @app.route("/api/run", methods=["POST"])
@@ -376,7 +413,12 @@ def start_run():
 def run_status(run_id):
     # Try active run first for live progress
     if run_id in _active_runs:
-        progress = _active_runs[run_id]
+        progress = dict(_active_runs[run_id])
+        if progress["phase"] is None:
+            progress["phase"] = (
+                f"{progress['current_company']}: {progress['phase_name']} "
+                f"{progress['phase_done']}/{progress['phase_total']}"
+            )
         return jsonify({"run_id": run_id, **progress})
 
     # Fall back to DB
@@ -399,6 +441,8 @@ def latest_run():
 def get_results():
     run_id = request.args.get("run_id")
     company = request.args.get("company")
+    company_exact = request.args.get("company_exact")
+    company_prefix = request.args.get("company_prefix")
     keyword = request.args.get("keyword")
     min_score = request.args.get("min_score")
     location = request.args.get("location")
@@ -406,6 +450,8 @@ def get_results():
     results = db.get_results(
         run_id=run_id,
         company=company,
+        company_exact=company_exact,
+        company_prefix=company_prefix,
         keyword=keyword,
         min_score=float(min_score) if min_score else None,
         location=location,
@@ -419,13 +465,17 @@ def get_results():
 def export():
     run_id = request.args.get("run_id")
     company = request.args.get("company")
+    company_exact = request.args.get("company_exact")
+    company_prefix = request.args.get("company_prefix")
     keyword = request.args.get("keyword")
     min_score = request.args.get("min_score")
     location = request.args.get("location")
 
-    results = db.get_results(
+    results = db.iter_results(
         run_id=run_id,
         company=company,
+        company_exact=company_exact,
+        company_prefix=company_prefix,
         keyword=keyword,
         min_score=float(min_score) if min_score else None,
         location=location,
@@ -435,7 +485,7 @@ def export():
     filepath = os.path.join(EXPORT_DIR, filename)
     export_results(results, filepath)
 
-    return send_file(filepath, as_attachment=True, download_name=filename)
+    return send_file(filepath, as_attachment=True, conditional=True, download_name=filename)
 
 
 # ── Main ────────────────────────────────────────────────────────────
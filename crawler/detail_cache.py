@@ -0,0 +1,110 @@
+"""Persistent on-disk cache for Workday job-detail responses."""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import date
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.environ.get(
+    "JOBFINDER_DETAIL_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "workday_details.sqlite"),
+)
+
+# Keys are scoped to the day (see make_key), so nothing fetched before today's
+# local midnight can be read again; sweep() deletes those rows.
+
+_lock = threading.Lock()  # serializes use of the shared connection
+_conn = None
+
+
+def _start_of_today():
+    """Unix timestamp of today's local midnight."""
+    return int(time.mktime(date.today().timetuple()))
+
+
+def _connect():
+    """Return the shared cache connection, creating the schema on first use. Call with _lock held."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS details (
+                key TEXT PRIMARY KEY,
+                site_key TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                fetched_at INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_details_site ON details(site_key);
+            CREATE INDEX IF NOT EXISTS idx_details_fetched ON details(fetched_at);
+        """)
+        _conn = conn
+    return _conn
+
+
+def _site_key(host, tenant, site):
+    return f"{host}|{tenant}|{site}"
+
+
+def make_key(host, tenant, site, external_path, day=""):
+    """
+    Cache key for one posting's detail response on a given day (YYYY-MM-DD).
+
+    Including the day means a posting reposted under the same externalPath on
+    a later day is fetched fresh, rather than served with a stale startDate.
+    """
+    raw = f"{host}|{tenant}|{site}|{external_path}|{day}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def sweep():
+    """Delete entries fetched before today (unreachable under day-scoped keys). Returns rows removed."""
+    try:
+        with _lock:
+            cur = _connect().execute("DELETE FROM details WHERE fetched_at < ?", (_start_of_today(),))
+            return cur.rowcount
+    except sqlite3.Error as e:
+        logger.warning(f"Detail cache sweep failed: {e}")
+        return 0
+
+
+def get(key):
+    """Return the cached detail dict for key, or None on a miss / stale entry."""
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT payload FROM details WHERE key=? AND fetched_at >= ?",
+                (key, _start_of_today()),
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Detail cache read failed: {e}")
+        return None
+    return orjson.loads(row[0]) if row else None
+
+
+def put(key, host, tenant, site, detail):
+    """Store a parsed detail dict (write-through after a fetch)."""
+    try:
+        with _lock:
+            _connect().execute(
+                "INSERT OR REPLACE INTO details (key, site_key, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, _site_key(host, tenant, site), orjson.dumps(detail), int(time.time())),
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Detail cache write failed: {e}")
+
+
+def invalidate(host, tenant, site):
+    """Drop every cached detail for one Workday site. Returns rows removed."""
+    with _lock:
+        cur = _connect().execute("DELETE FROM details WHERE site_key=?", (_site_key(host, tenant, site),))
+        return cur.rowcount
@@ -3,17 +3,35 @@
 import re
 import time
 import logging
+import functools
+import threading
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from collections import namedtuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, date
+from datetime import date
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _FAST_HTML = True
+except ImportError:  # fall back to BeautifulSoup
+    _FAST_HTML = False
+
+from crawler import detail_cache
 
 logger = logging.getLogger(__name__)
 
 # ── URL Parsing ─────────────────────────────────────────────────────
 
+_TENANT_RE = re.compile(r"^([^.]+)\.wd\d+\.myworkdayjobs\.com$")
+_LOCALE_RE = re.compile(r"^[a-z]{2}-[A-Z]{2}$")
+
+WorkdaySite = namedtuple("WorkdaySite", ["host", "tenant", "site"])
 
+
+@functools.lru_cache(maxsize=512)
 def parse_workday_url(url):
     """
     Extract host, tenant, and site from a Workday careers URL.
@@ -23,7 +41,8 @@ def parse_workday_url(url):
         https://adobe.wd5.myworkdayjobs.com/external_experienced?q=foo
         https://adobe.wd5.myworkdayjobs.com/en-US/external_experienced
 
-    Returns: {"host": ..., "tenant": ..., "site": ...} or None
+    Returns: WorkdaySite(host, tenant, site) or None. Results are cached,
+    so the returned tuple is immutable.
     """
     parsed = urlparse(url.strip())
     host = parsed.hostname
@@ -31,7 +50,7 @@ def parse_workday_url(url):
         return None
 
     # Tenant is the subdomain prefix before .wd
-    tenant_match = re.match(r"^([^.]+)\.wd\d+\.myworkdayjobs\.com$", host)
+    tenant_match = _TENANT_RE.match(host)
     if not tenant_match:
         return None
     tenant = tenant_match.group(1)
@@ -39,12 +58,12 @@ def parse_workday_url(url):
     # Site is the last path segment (skip language prefixes like /en-US/)
     path_parts = [p for p in parsed.path.strip("/").split("/") if p]
     # Filter out locale segments like en-US
-    path_parts = [p for p in path_parts if not re.match(r"^[a-z]{2}-[A-Z]{2}$", p)]
+    path_parts = [p for p in path_parts if not _LOCALE_RE.match(p)]
     if not path_parts:
         return None
     site = path_parts[0]
 
-    return {"host": host, "tenant": tenant, "site": site}
+    return WorkdaySite(host, tenant, site)
 
 
 # ── API Calls ───────────────────────────────────────────────────────
@@ -52,40 +71,90 @@ def parse_workday_url(url):
 DEFAULT_HEADERS = {
     "Content-Type": "application/json",
     "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
 }
 
 REQUEST_TIMEOUT = 30
-RATE_LIMIT_DELAY = 0.3  # seconds between requests (reduced from 1.0 for speed)
+RATE_LIMIT_PER_HOST = 10  # max requests/second to one Workday host, shared by all threads
 MAX_RETRIES = 3
 DETAIL_WORKERS = 5      # concurrent detail-fetch threads per company
 
+_POSTED_TODAY = "Posted Today"
+
+# One keep-alive connection pool shared by every request (avoids a TCP+TLS
+# handshake per call). Retries are handled by _request_with_retry.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0))
+
+
+class TokenBucket:
+    """Thread-safe token bucket that caps the combined request rate of every caller."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, blocking until one is available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 0
+                self.last = time.monotonic()
+            else:
+                self.tokens -= 1
+
+
+_buckets = {}  # host -> TokenBucket
+_buckets_lock = threading.Lock()
+
+
+def _throttle(host):
+    """Block until a request to host is allowed by its shared rate limit."""
+    bucket = _buckets.get(host)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.setdefault(host, TokenBucket(RATE_LIMIT_PER_HOST))
+    bucket.acquire()
+
 
 def _request_with_retry(method, url, **kwargs):
     """Make an HTTP request with retries and exponential backoff."""
     kwargs.setdefault("timeout", REQUEST_TIMEOUT)
     kwargs.setdefault("headers", DEFAULT_HEADERS)
 
-    resp = None
     for attempt in range(MAX_RETRIES):
+        last_attempt = attempt == MAX_RETRIES - 1
         try:
-            resp = requests.request(method, url, **kwargs)
+            resp = _SESSION.request(method, url, **kwargs)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except requests.exceptions.HTTPError as e:
-            if resp is not None and (resp.status_code == 429 or resp.status_code >= 500):
+            # Read the status from the error itself, never from a response
+            # left over from an earlier attempt.
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and (status == 429 or status >= 500):
+                if last_attempt:
+                    logger.error(f"Giving up on {url} after {MAX_RETRIES} attempts (HTTP {status})")
+                    break
                 wait = (2 ** attempt) * 2
-                logger.warning(f"Retry {attempt+1}/{MAX_RETRIES} for {url} (HTTP {resp.status_code}), waiting {wait}s")
+                logger.warning(f"Retry {attempt+1}/{MAX_RETRIES} for {url} (HTTP {status}), waiting {wait}s")
                 time.sleep(wait)
                 continue
             logger.error(f"HTTP error for {url}: {e}")
             raise
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            if last_attempt:
+                raise
             wait = (2 ** attempt) * 2
             logger.warning(f"Retry {attempt+1}/{MAX_RETRIES} for {url}: {e}, waiting {wait}s")
             time.sleep(wait)
-            if attempt == MAX_RETRIES - 1:
-                raise
     return None
 
 
@@ -96,23 +165,23 @@ def fetch_listings(host, tenant, site, search_text="", limit=20, offset=0):
     Returns: {"total": int, "jobPostings": [...]}
     """
     url = f"https://{host}/wday/cxs/{tenant}/{site}/jobs"
+    _throttle(host)
     payload = {
         "appliedFacets": {},
         "limit": limit,
         "offset": offset,
         "searchText": search_text,
     }
-    return _request_with_retry("POST", url, json=payload)
+    return _request_with_retry("POST", url, data=orjson.dumps(payload))
 
 
-def fetch_all_listings(host, tenant, site, search_text="", page_size=20, progress_callback=None):
+def iter_today_listings(host, tenant, site, search_text="", page_size=20, progress_callback=None):
     """
-    Fetch ALL job listings with pagination.
-    Only returns listings where postedOn == "Posted Today".
+    Paginate the listing endpoint, yielding each page's "Posted Today" jobs
+    as soon as it is parsed so callers can start work before pagination ends.
 
-    Returns: list of job card dicts that are posted today.
+    Yields: list of job card dicts (possibly empty) per page.
     """
-    today_jobs = []
     offset = 0
     total = None
     seen_non_today = 0
@@ -130,22 +199,23 @@ def fetch_all_listings(host, tenant, site, search_text="", page_size=20, progres
         if not postings:
             break
 
+        page_today = []
         for job in postings:
-            posted = job.get("postedOn", "")
-            if posted == "Posted Today":
-                today_jobs.append(job)
+            if job.get("postedOn") == _POSTED_TODAY:
+                page_today.append(job)
             else:
                 seen_non_today += 1
 
         if progress_callback:
             progress_callback(offset + len(postings), total)
 
+        yield page_today
+
         offset += page_size
 
         # Workday returns jobs newest-first by default.
         # Once we see a full page with zero "Posted Today" jobs, we can stop early.
-        page_today_count = sum(1 for j in postings if j.get("postedOn") == "Posted Today")
-        if page_today_count == 0 and offset > page_size:
+        if not page_today and offset > page_size:
             # We've moved past today's jobs
             logger.info(f"No 'Posted Today' on this page (offset={offset}), stopping pagination early.")
             break
@@ -153,12 +223,36 @@ def fetch_all_listings(host, tenant, site, search_text="", page_size=20, progres
         if offset >= total:
             break
 
-        time.sleep(RATE_LIMIT_DELAY)
+
+def fetch_all_listings(host, tenant, site, search_text="", page_size=20, progress_callback=None):
+    """
+    Fetch ALL job listings with pagination.
+    Only returns listings where postedOn == "Posted Today".
+
+    Returns: list of job card dicts that are posted today.
+    """
+    today_jobs = []
+    for page in iter_today_listings(host, tenant, site, search_text, page_size, progress_callback):
+        today_jobs.extend(page)
 
     logger.info(f"Found {len(today_jobs)} 'Posted Today' jobs for {tenant}/{site}")
     return today_jobs
 
 
+def _html_to_text(html):
+    """Convert a job-description HTML fragment to newline-separated plain text."""
+    if _FAST_HTML:
+        tree = LexborHTMLParser(html)
+        for node in tree.css("script, style"):
+            node.decompose()
+        # Lexbor keeps whitespace-only text nodes as empty lines; drop them to
+        # match BeautifulSoup's get_text(separator="\n", strip=True)
+        text = tree.text(separator="\n", strip=True)
+        return "\n".join(line for line in text.split("\n") if line)
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser").get_text(separator="\n", strip=True)
+
+
 def fetch_job_detail(host, tenant, site, external_path):
     """
     Fetch full job detail from the Workday detail endpoint.
@@ -168,6 +262,7 @@ def fetch_job_detail(host, tenant, site, external_path):
     # external_path looks like: /job/San-Jose/Some-Title_R164668
     path = external_path.lstrip("/")
     url = f"https://{host}/wday/cxs/{tenant}/{site}/{path}"
+    _throttle(host)
     data = _request_with_retry("GET", url)
     if not data or "jobPostingInfo" not in data:
         return None
@@ -177,8 +272,7 @@ def fetch_job_detail(host, tenant, site, external_path):
     # Parse HTML description to plain text
     raw_desc = info.get("jobDescription", "")
     if raw_desc:
-        soup = BeautifulSoup(raw_desc, "html.parser")
-        info["jd_plain_text"] = soup.get_text(separator="\n", strip=True)
+        info["jd_plain_text"] = _html_to_text(raw_desc)
     else:
         info["jd_plain_text"] = ""
 
@@ -187,14 +281,18 @@ def fetch_job_detail(host, tenant, site, external_path):
 
 # ── Convenience ─────────────────────────────────────────────────────
 
-def _fetch_one_detail(host, tenant, site, listing, today):
+def _fetch_one_detail(host, tenant, site, listing):
     """Fetch detail for a single listing. Returns enriched dict or None."""
-    time.sleep(RATE_LIMIT_DELAY)
     try:
-        detail = fetch_job_detail(host, tenant, site, listing["externalPath"])
-        if not detail:
-            logger.warning(f"Could not fetch detail for {listing['externalPath']}")
-            return None
+        cache_key = detail_cache.make_key(host, tenant, site, listing["externalPath"],
+                                          date.today().isoformat())
+        detail = detail_cache.get(cache_key)
+        if detail is None:
+            detail = fetch_job_detail(host, tenant, site, listing["externalPath"])
+            if not detail:
+                logger.warning(f"Could not fetch detail for {listing['externalPath']}")
+                return None
+            detail_cache.put(cache_key, host, tenant, site, detail)
 
         start_date_str = detail.get("startDate")
 
@@ -221,9 +319,9 @@ def _fetch_one_detail(host, tenant, site, listing, today):
 def crawl_company(host, tenant, site, progress_callback=None, title_filter_fn=None):
     """
     Full crawl pipeline for one company:
-    1. Fetch all "Posted Today" listings
-    2. Early-filter by title (BEFORE fetching details — huge speedup)
-    3. Fetch detail for each matching listing (in parallel)
+    1. Page through "Posted Today" listings
+    2. Early-filter each page by title (BEFORE fetching details — huge speedup)
+    3. Queue detail fetches for matching listings while later pages load
     4. Return enriched job dicts
 
     Args:
@@ -233,31 +331,38 @@ def crawl_company(host, tenant, site, progress_callback=None, title_filter_fn=No
 
     Returns: list of enriched job dicts
     """
-    listings = fetch_all_listings(host, tenant, site, progress_callback=progress_callback)
+    enriched = []
+    listed = 0
+    skipped = 0
 
-    # Early title filter: skip detail fetching for irrelevant jobs
-    if title_filter_fn:
-        before = len(listings)
-        listings = [l for l in listings if title_filter_fn(l)]
-        skipped = before - len(listings)
+    # Detail fetches are submitted page by page while pagination continues,
+    # so listing and detail requests overlap instead of running back to back.
+    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as executor:
+        futures = []
+        for page in iter_today_listings(host, tenant, site, progress_callback=progress_callback):
+            listed += len(page)
+
+            # Early title filter: skip detail fetching for irrelevant jobs
+            if title_filter_fn:
+                relevant = [l for l in page if title_filter_fn(l)]
+                skipped += len(page) - len(relevant)
+                page = relevant
+
+            futures.extend(
+                executor.submit(_fetch_one_detail, host, tenant, site, listing)
+                for listing in page
+            )
+
+        logger.info(f"Found {listed} 'Posted Today' jobs for {tenant}/{site}")
         if skipped:
             logger.info(
-                f"Early title filter: {before} listings -> {len(listings)} relevant "
+                f"Early title filter: {listed} listings -> {len(futures)} relevant "
                 f"({skipped} skipped before detail fetch)"
             )
 
-    enriched = []
-    today = date.today()
-    total = len(listings)
-    done_count = 0
-
-    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as executor:
-        future_to_idx = {
-            executor.submit(_fetch_one_detail, host, tenant, site, listing, today): i
-            for i, listing in enumerate(listings)
-        }
-
-        for future in as_completed(future_to_idx):
+        total = len(futures)
+        done_count = 0
+        for future in as_completed(futures):
             result = future.result()
             if result is not None:
                 enriched.append(result)
@@ -267,4 +372,3 @@ def crawl_company(host, tenant, site, progress_callback=None, title_filter_fn=No
                 progress_callback(done_count, total, phase="details")
 
     return enriched
-
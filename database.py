@@ -2,24 +2,113 @@
 
 import sqlite3
 import os
+import re
 import uuid
-import json
-from datetime import datetime
+import orjson
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "jobfinder.db")
 
+# Stored in PRAGMA user_version. Bump whenever init_db() changes the schema
+# so existing databases pick the change up on next start.
+SCHEMA_VERSION = 2
+
+
+def utc_now():
+    """Current UTC time as an ISO-8601 string with offset, to the second."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
 
 def get_db():
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(DB_PATH)
+    """
+    Get a tuned database connection with row factory.
+
+    Connections are in autocommit mode (isolation_level=None): single
+    statements commit immediately and multi-statement writes go through
+    transaction(), which issues an explicit BEGIN IMMEDIATE.
+    """
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # safe under WAL; no fsync per commit
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA cache_size=-20000")  # 20 MB page cache
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+# ── Connection Pool ─────────────────────────────────────────────────
+#
+# Readers borrow tuned connections from a small queue; all writes share one
+# writer connection, serialized by a lock (SQLite allows one writer anyway).
+
+_READ_POOL = queue.Queue(maxsize=8)
+_WRITER_LOCK = threading.RLock()
+_writer_conn = None
+
+
+@contextmanager
+def reader():
+    """Borrow a pooled read connection."""
+    try:
+        conn = _READ_POOL.get_nowait()
+    except queue.Empty:
+        conn = get_db()
+    try:
+        yield conn
+    finally:
+        try:
+            _READ_POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def writer():
+    """Hold the shared writer connection for the duration of the block."""
+    global _writer_conn
+    with _WRITER_LOCK:
+        if _writer_conn is None:
+            _writer_conn = get_db()
+        yield _writer_conn
+
+
+@contextmanager
+def transaction():
+    """
+    Yield the writer connection inside a single BEGIN IMMEDIATE ... COMMIT.
+    Rolled back if the block raises. Pass the connection to helpers that
+    accept conn= to group several writes under one commit.
+    """
+    with writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+# Secondary indexes on jobs, shared by init_db() and bulk_insert_jobs().
+# idx_jobs_run_score serves WHERE run_id=? ORDER BY match_score DESC without a
+# sort step; its run_id prefix also covers plain run_id lookups.
+_JOB_INDEXES = {
+    "idx_jobs_company": "CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_id)",
+    "idx_jobs_score": "CREATE INDEX IF NOT EXISTS idx_jobs_score ON jobs(match_score DESC)",
+    "idx_jobs_run_score": "CREATE INDEX IF NOT EXISTS idx_jobs_run_score ON jobs(run_id, match_score DESC)",
+}
+_JOB_INDEXES_SQL = "".join(f"{sql};\n" for sql in _JOB_INDEXES.values())
+
+
 def init_db():
-    """Create all tables if they don't exist."""
+    """Create all tables if they don't exist and stamp the schema version."""
     conn = get_db()
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS companies (
@@ -77,10 +166,9 @@ def init_db():
             updated_at TEXT
         );
 
-        CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_id);
-        CREATE INDEX IF NOT EXISTS idx_jobs_score ON jobs(match_score DESC);
-        CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs(run_id);
-    """)
+        CREATE INDEX IF NOT EXISTS idx_companies_name_nocase ON companies(company_name COLLATE NOCASE);
+        DROP INDEX IF EXISTS idx_jobs_run;
+    """ + _JOB_INDEXES_SQL)
     conn.commit()
 
     # Migrations: add new columns to existing tables (safe to re-run)
@@ -95,208 +183,318 @@ def init_db():
         except Exception:
             pass  # Column already exists
 
+    # Full-text index over title + description for keyword search. External
+    # content: rows live in `jobs` and triggers keep the index in sync via the
+    # implicit rowid (so the database must not be VACUUMed).
+    fts_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name='jobs_fts'").fetchone()
+    conn.executescript("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, jd_text, content='jobs', content_rowid='rowid', tokenize='porter unicode61'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts(rowid, title, jd_text) VALUES (new.rowid, new.title, new.jd_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, jd_text) VALUES ('delete', old.rowid, old.title, old.jd_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title, jd_text ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, jd_text) VALUES ('delete', old.rowid, old.title, old.jd_text);
+            INSERT INTO jobs_fts(rowid, title, jd_text) VALUES (new.rowid, new.title, new.jd_text);
+        END;
+    """)
+    if not fts_exists:
+        conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")  # index pre-existing rows
+
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.close()
 
 
+def _ensure_schema():
+    """Run init_db() only if the database is older than SCHEMA_VERSION."""
+    conn = get_db()
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+    if version < SCHEMA_VERSION:
+        init_db()
+
+
 # ── Company Operations ──────────────────────────────────────────────
 
+_UPSERT_COMPANY_SQL = """
+    INSERT INTO companies (company_id, company_name, workday_url, note, preferred_keywords)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(company_id) DO UPDATE SET
+        company_name=excluded.company_name,
+        workday_url=excluded.workday_url,
+        note=excluded.note,
+        preferred_keywords=excluded.preferred_keywords
+"""
+
+
 def upsert_companies(companies):
-    """Insert or update companies. Returns count inserted."""
-    conn = get_db()
-    count = 0
-    for c in companies:
-        cid = c.get("company_id") or str(uuid.uuid4())[:8]
-        conn.execute("""
-            INSERT INTO companies (company_id, company_name, workday_url, note, preferred_keywords)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(company_id) DO UPDATE SET
-                company_name=excluded.company_name,
-                workday_url=excluded.workday_url,
-                note=excluded.note,
-                preferred_keywords=excluded.preferred_keywords
-        """, (cid, c["company_name"], c["workday_url"], c.get("note"), c.get("preferred_keywords")))
-        count += 1
-    conn.commit()
-    conn.close()
-    return count
+    """Insert or update companies with one prepared statement. Returns count written."""
+    rows = [
+        (c.get("company_id") or str(uuid.uuid4())[:8], c["company_name"], c["workday_url"],
+         c.get("note"), c.get("preferred_keywords"))
+        for c in companies
+    ]
+    if rows:
+        with transaction() as conn:
+            conn.executemany(_UPSERT_COMPANY_SQL, rows)
+    return len(rows)
 
 
 def get_all_companies():
     """Get all companies."""
-    conn = get_db()
-    rows = conn.execute("SELECT * FROM companies ORDER BY company_name").fetchall()
-    conn.close()
+    with reader() as conn:
+        rows = conn.execute("SELECT * FROM companies ORDER BY company_name").fetchall()
     return [dict(r) for r in rows]
 
 
 def clear_companies():
     """Remove all companies."""
-    conn = get_db()
-    conn.execute("DELETE FROM jobs")  # Clear dependent jobs first
-    conn.execute("DELETE FROM companies")
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM jobs")  # Clear dependent jobs first
+        conn.execute("DELETE FROM companies")
 
 
-def update_company_run_status(company_id, status):
-    """Update company last run status."""
-    conn = get_db()
+def update_company_run_status(company_id, status, conn=None):
+    """Update company last run status (inside conn's transaction if given)."""
+    if conn is None:
+        with transaction() as conn:
+            return update_company_run_status(company_id, status, conn)
     conn.execute(
         "UPDATE companies SET last_run_status=?, last_run_time=? WHERE company_id=?",
-        (status, datetime.utcnow().isoformat(), company_id),
+        (status, utc_now(), company_id),
     )
-    conn.commit()
-    conn.close()
 
 
 # ── Job Operations ──────────────────────────────────────────────────
 
 def upsert_job(job):
     """Insert or update a job. Returns True if new."""
-    conn = get_db()
-    now = datetime.utcnow().isoformat()
-    existing = conn.execute("SELECT job_key FROM jobs WHERE job_key=?", (job["job_key"],)).fetchone()
-    if existing:
-        conn.execute("""
-            UPDATE jobs SET last_seen=?, posted_label=?, match_score=?, matched_keywords=?,
-                experience_years=?, visa_sponsorship=?, run_id=?
-            WHERE job_key=?
-        """, (now, job.get("posted_label"), job.get("match_score"), job.get("matched_keywords"),
-              job.get("experience_years", "--"), job.get("visa_sponsorship", "Unknown"),
-              job.get("run_id"), job["job_key"]))
-        conn.commit()
-        conn.close()
-        return False
-    else:
-        conn.execute("""
-            INSERT INTO jobs (job_key, company_id, title, locations_text, country_guess,
-                posted_label, job_url, jd_text, match_score, matched_keywords,
-                experience_years, visa_sponsorship, first_seen, last_seen, run_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    now = utc_now()
+    with transaction() as conn:
+        existing = conn.execute("SELECT job_key FROM jobs WHERE job_key=?", (job["job_key"],)).fetchone()
+        if existing:
+            conn.execute("""
+                UPDATE jobs SET last_seen=?, posted_label=?, match_score=?, matched_keywords=?,
+                    experience_years=?, visa_sponsorship=?, run_id=?
+                WHERE job_key=?
+            """, (now, job.get("posted_label"), job.get("match_score"), job.get("matched_keywords"),
+                  job.get("experience_years", "--"), job.get("visa_sponsorship", "Unknown"),
+                  job.get("run_id"), job["job_key"]))
+            return False
+        else:
+            conn.execute("""
+                INSERT INTO jobs (job_key, company_id, title, locations_text, country_guess,
+                    posted_label, job_url, jd_text, match_score, matched_keywords,
+                    experience_years, visa_sponsorship, first_seen, last_seen, run_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                job["job_key"], job["company_id"], job["title"], job.get("locations_text"),
+                job.get("country_guess"), job.get("posted_label"), job.get("job_url"),
+                job.get("jd_text"), job.get("match_score"), job.get("matched_keywords"),
+                job.get("experience_years", "--"), job.get("visa_sponsorship", "Unknown"),
+                now, now, job.get("run_id"),
+            ))
+            return True
+
+
+_UPSERT_JOB_SQL = """
+    INSERT INTO jobs (job_key, company_id, title, locations_text, country_guess,
+        posted_label, job_url, jd_text, match_score, matched_keywords,
+        experience_years, visa_sponsorship, first_seen, last_seen, run_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(job_key) DO UPDATE SET
+        last_seen=excluded.last_seen,
+        posted_label=excluded.posted_label,
+        match_score=excluded.match_score,
+        matched_keywords=excluded.matched_keywords,
+        experience_years=excluded.experience_years,
+        visa_sponsorship=excluded.visa_sponsorship,
+        run_id=excluded.run_id
+"""
+
+
+def upsert_jobs_batch(jobs, conn=None):
+    """
+    Insert or update multiple jobs with one prepared statement in a single transaction.
+    Existing rows keep their first_seen. If conn is given, the writes join that
+    connection's open transaction instead.
+    """
+    if not jobs:
+        return
+    if conn is None:
+        with transaction() as conn:
+            return upsert_jobs_batch(jobs, conn)
+    now = utc_now()
+    conn.executemany(_UPSERT_JOB_SQL, [
+        (
             job["job_key"], job["company_id"], job["title"], job.get("locations_text"),
             job.get("country_guess"), job.get("posted_label"), job.get("job_url"),
             job.get("jd_text"), job.get("match_score"), job.get("matched_keywords"),
             job.get("experience_years", "--"), job.get("visa_sponsorship", "Unknown"),
             now, now, job.get("run_id"),
-        ))
-        conn.commit()
-        conn.close()
-        return True
+        )
+        for job in jobs
+    ])
 
 
-def upsert_jobs_batch(jobs):
-    """Insert or update multiple jobs in a single transaction. Much faster than calling upsert_job() in a loop."""
-    if not jobs:
-        return
-    conn = get_db()
-    now = datetime.utcnow().isoformat()
-    try:
-        for job in jobs:
-            existing = conn.execute("SELECT job_key FROM jobs WHERE job_key=?", (job["job_key"],)).fetchone()
-            if existing:
-                conn.execute("""
-                    UPDATE jobs SET last_seen=?, posted_label=?, match_score=?, matched_keywords=?,
-                        experience_years=?, visa_sponsorship=?, run_id=?
-                    WHERE job_key=?
-                """, (now, job.get("posted_label"), job.get("match_score"), job.get("matched_keywords"),
-                      job.get("experience_years", "--"), job.get("visa_sponsorship", "Unknown"),
-                      job.get("run_id"), job["job_key"]))
-            else:
-                conn.execute("""
-                    INSERT INTO jobs (job_key, company_id, title, locations_text, country_guess,
-                        posted_label, job_url, jd_text, match_score, matched_keywords,
-                        experience_years, visa_sponsorship, first_seen, last_seen, run_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    job["job_key"], job["company_id"], job["title"], job.get("locations_text"),
-                    job.get("country_guess"), job.get("posted_label"), job.get("job_url"),
-                    job.get("jd_text"), job.get("match_score"), job.get("matched_keywords"),
-                    job.get("experience_years", "--"), job.get("visa_sponsorship", "Unknown"),
-                    now, now, job.get("run_id"),
-                ))
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+BULK_INSERT_THRESHOLD = 500  # rows; smaller batches always maintain indexes in place
 
 
-def get_results(run_id=None, company=None, keyword=None, min_score=None, location=None):
-    """Query jobs with optional filters."""
-    conn = get_db()
+def bulk_insert_jobs(jobs, conn=None):
+    """
+    Upsert a large batch of jobs with the secondary indexes dropped, then rebuild them.
+
+    Rebuilding re-reads the whole table, so it only pays off when the batch is at
+    least as big as what is already stored (e.g. the first crawl into an empty
+    database). Otherwise this is just upsert_jobs_batch(). The job_key primary
+    key stays in place for the upsert, and everything runs in one transaction,
+    so readers never see the indexes missing.
+    """
+    if len(jobs) < BULK_INSERT_THRESHOLD:
+        return upsert_jobs_batch(jobs, conn)
+    if conn is None:
+        with transaction() as conn:
+            return bulk_insert_jobs(jobs, conn)
+    # MAX(rowid) is an O(log n) upper bound on the row count
+    existing = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM jobs").fetchone()[0]
+    if len(jobs) < existing:
+        return upsert_jobs_batch(jobs, conn)
+    for name in _JOB_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    upsert_jobs_batch(jobs, conn)
+    for sql in _JOB_INDEXES.values():
+        conn.execute(sql)
+
+
+# Keywords made only of word characters, spaces and hyphens go through the FTS
+# index; anything else (e.g. "c++", "node.js") keeps the substring LIKE scan.
+_FTS_SAFE_RE = re.compile(r"^[\w\s-]+$")
+
+
+def _build_results_query(run_id=None, company=None, keyword=None, min_score=None, location=None,
+                         company_exact=None, company_prefix=None):
+    """
+    Build the filtered jobs query. Returns (sql, params).
+
+    Conditions are appended cheapest first — indexed equality/range filters,
+    then substring LIKEs, then the keyword search — so rows rejected by the
+    cheap filters never reach the expensive ones.
+    """
+    use_fts = bool(keyword and keyword.strip() and _FTS_SAFE_RE.match(keyword))
     query = """
         SELECT j.*, c.company_name
         FROM jobs j JOIN companies c ON j.company_id = c.company_id
-        WHERE 1=1
     """
+    if use_fts:
+        query += " JOIN jobs_fts f ON f.rowid = j.rowid"
+    query += " WHERE 1=1"
     params = []
     if run_id:
         query += " AND j.run_id = ?"
         params.append(run_id)
-    if company:
-        query += " AND c.company_name LIKE ?"
-        params.append(f"%{company}%")
-    if keyword:
-        query += " AND (j.title LIKE ? OR j.jd_text LIKE ?)"
-        params.append(f"%{keyword}%")
-        params.append(f"%{keyword}%")
     if min_score is not None:
         query += " AND j.match_score >= ?"
         params.append(float(min_score))
+    if company_exact:
+        # NOCASE so the equality can use idx_companies_name_nocase
+        query += " AND c.company_name = ? COLLATE NOCASE"
+        params.append(company_exact)
+    elif company_prefix:
+        # 'X%' lets SQLite turn the LIKE into a range scan on idx_companies_name_nocase
+        escaped = company_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query += " AND c.company_name LIKE ? ESCAPE '\\'"
+        params.append(f"{escaped}%")
+    elif company:
+        query += " AND c.company_name LIKE ?"
+        params.append(f"%{company}%")
     if location:
         query += " AND j.locations_text LIKE ?"
         params.append(f"%{location}%")
+    if use_fts:
+        # Phrase-prefix query: matches the words in order, last one as a prefix
+        query += " AND jobs_fts MATCH ?"
+        params.append(f'"{keyword.strip()}"*')
+    elif keyword:
+        query += " AND (j.title LIKE ? OR j.jd_text LIKE ?)"
+        params.append(f"%{keyword}%")
+        params.append(f"%{keyword}%")
     query += " ORDER BY j.match_score DESC"
-    rows = conn.execute(query, params).fetchall()
-    conn.close()
+    return query, params
+
+
+def get_results(run_id=None, company=None, keyword=None, min_score=None, location=None,
+                company_exact=None, company_prefix=None):
+    """
+    Query jobs with optional filters.
+
+    Company filters, fastest first: company_exact (full name, case-insensitive), company_prefix
+    (case-insensitive "starts with", index range scan), company (substring, full scan).
+    """
+    query, params = _build_results_query(run_id, company, keyword, min_score, location,
+                                         company_exact, company_prefix)
+    with reader() as conn:
+        rows = conn.execute(query, params).fetchall()
     return [dict(r) for r in rows]
 
 
+def iter_results(run_id=None, company=None, keyword=None, min_score=None, location=None,
+                 company_exact=None, company_prefix=None):
+    """Like get_results(), but yields rows one at a time straight off the cursor."""
+    query, params = _build_results_query(run_id, company, keyword, min_score, location,
+                                         company_exact, company_prefix)
+    with reader() as conn:
+        cur = conn.execute(query, params)
+        try:
+            for row in cur:
+                yield dict(row)
+        finally:
+            cur.close()  # release the read snapshot before the connection is reused
+
+
 # ── Run Operations ──────────────────────────────────────────────────
 
 def create_run():
     """Create a new run record."""
-    conn = get_db()
     run_id = str(uuid.uuid4())[:8]
-    now = datetime.utcnow().isoformat()
-    conn.execute(
-        "INSERT INTO runs (run_id, started_at, status) VALUES (?, ?, 'running')",
-        (run_id, now),
-    )
-    conn.commit()
-    conn.close()
+    now = utc_now()
+    with writer() as conn:
+        conn.execute(
+            "INSERT INTO runs (run_id, started_at, status) VALUES (?, ?, 'running')",
+            (run_id, now),
+        )
     return run_id
 
 
 def update_run(run_id, **kwargs):
     """Update run fields."""
-    conn = get_db()
     sets = []
     params = []
     for k, v in kwargs.items():
         sets.append(f"{k}=?")
         params.append(v)
     params.append(run_id)
-    conn.execute(f"UPDATE runs SET {', '.join(sets)} WHERE run_id=?", params)
-    conn.commit()
-    conn.close()
+    with writer() as conn:
+        conn.execute(f"UPDATE runs SET {', '.join(sets)} WHERE run_id=?", params)
 
 
 def get_run(run_id):
     """Get a run record."""
-    conn = get_db()
-    row = conn.execute("SELECT * FROM runs WHERE run_id=?", (run_id,)).fetchone()
-    conn.close()
+    with reader() as conn:
+        row = conn.execute("SELECT * FROM runs WHERE run_id=?", (run_id,)).fetchone()
     return dict(row) if row else None
 
 
 def get_latest_run():
     """Get the most recent run."""
-    conn = get_db()
-    row = conn.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()
-    conn.close()
+    with reader() as conn:
+        row = conn.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()
     return dict(row) if row else None
 
 
@@ -304,31 +502,28 @@ def get_latest_run():
 
 def save_resume(text, sections=None, skills=None):
     """Save or update the user's resume."""
-    conn = get_db()
-    now = datetime.utcnow().isoformat()
-    conn.execute("""
-        INSERT INTO resume (user_id, resume_text, resume_sections, skills_list, updated_at)
-        VALUES ('default', ?, ?, ?, ?)
-        ON CONFLICT(user_id) DO UPDATE SET
-            resume_text=excluded.resume_text,
-            resume_sections=excluded.resume_sections,
-            skills_list=excluded.skills_list,
-            updated_at=excluded.updated_at
-    """, (text, json.dumps(sections) if sections else None,
-          json.dumps(skills) if skills else None, now))
-    conn.commit()
-    conn.close()
+    now = utc_now()
+    with writer() as conn:
+        conn.execute("""
+            INSERT INTO resume (user_id, resume_text, resume_sections, skills_list, updated_at)
+            VALUES ('default', ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                resume_text=excluded.resume_text,
+                resume_sections=excluded.resume_sections,
+                skills_list=excluded.skills_list,
+                updated_at=excluded.updated_at
+        """, (text, orjson.dumps(sections).decode() if sections else None,
+              orjson.dumps(skills).decode() if skills else None, now))
 
 
 def get_resume():
     """Get the stored resume."""
-    conn = get_db()
-    row = conn.execute("SELECT * FROM resume WHERE user_id='default'").fetchone()
-    conn.close()
+    with reader() as conn:
+        row = conn.execute("SELECT * FROM resume WHERE user_id='default'").fetchone()
     if row:
         r = dict(row)
-        r["resume_sections"] = json.loads(r["resume_sections"]) if r["resume_sections"] else {}
-        r["skills_list"] = json.loads(r["skills_list"]) if r["skills_list"] else []
+        r["resume_sections"] = orjson.loads(r["resume_sections"]) if r["resume_sections"] else {}
+        r["skills_list"] = orjson.loads(r["skills_list"]) if r["skills_list"] else []
         return r
     return None
 
@@ -337,9 +532,8 @@ def get_resume():
 
 def get_setting(key, default=None):
     """Get a setting value by key."""
-    conn = get_db()
-    row = conn.execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
-    conn.close()
+    with reader() as conn:
+        row = conn.execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
     if row:
         return row["value"]
     return default
@@ -347,18 +541,16 @@ def get_setting(key, default=None):
 
 def save_setting(key, value):
     """Save or update a setting."""
-    conn = get_db()
-    now = datetime.utcnow().isoformat()
-    conn.execute("""
-        INSERT INTO settings (key, value, updated_at)
-        VALUES (?, ?, ?)
-        ON CONFLICT(key) DO UPDATE SET
-            value=excluded.value,
-            updated_at=excluded.updated_at
-    """, (key, value, now))
-    conn.commit()
-    conn.close()
+    now = utc_now()
+    with writer() as conn:
+        conn.execute("""
+            INSERT INTO settings (key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value=excluded.value,
+                updated_at=excluded.updated_at
+        """, (key, value, now))
 
 
-# Initialize DB on import
-init_db()
+# Initialize DB on import (no-op once the schema is current)
+_ensure_schema()
@@ -1,5 +1,7 @@
 """Filter for relevant job titles based on configurable target titles."""
 
+import functools
+
 # ── Default Target Titles ───────────────────────────────────────────
 
 # These are used as defaults when no custom titles are configured.
@@ -39,6 +41,25 @@ def _extract_keywords(title):
     return {w for w in words if w not in _STOP_WORDS and len(w) > 1}
 
 
+@functools.lru_cache(maxsize=64)
+def _target_keyword_sets(target_titles):
+    """
+    Keyword sets for a tuple of target titles, tokenized once and cached.
+    Titles with no significant keywords are dropped.
+    """
+    keyword_sets = (frozenset(_extract_keywords(t)) for t in target_titles)
+    return tuple(kw for kw in keyword_sets if kw)
+
+
+@functools.lru_cache(maxsize=64)
+def _target_vocabulary(target_sets):
+    """Union of all words in a tuple of target keyword sets."""
+    return frozenset().union(*target_sets)
+
+
+_DEFAULT_TARGET_KEYWORDS = _target_keyword_sets(tuple(DEFAULT_JOB_TITLES))
+
+
 def is_relevant_job(job, target_titles=None):
     """
     Check if a job title matches any of the target job titles.
@@ -61,18 +82,23 @@ def is_relevant_job(job, target_titles=None):
                        If None, uses DEFAULT_JOB_TITLES.
     """
     if target_titles is None:
-        target_titles = DEFAULT_JOB_TITLES
+        target_sets = _DEFAULT_TARGET_KEYWORDS
+    else:
+        target_sets = _target_keyword_sets(tuple(target_titles))
 
     job_title = job.get("title", "")
     if not job_title:
         return False
 
-    job_keywords = _extract_keywords(job_title)
+    # Fast reject: most crawled titles share no word with any target, and
+    # stop words never appear in the vocabulary, so the raw split suffices.
+    words = job_title.lower().split()
+    if _target_vocabulary(target_sets).isdisjoint(words):
+        return False
+
+    job_keywords = {w for w in words if w not in _STOP_WORDS and len(w) > 1}
 
-    for target in target_titles:
-        target_keywords = _extract_keywords(target)
-        if not target_keywords:
-            continue
+    for target_keywords in target_sets:
         # Job matches if it contains ALL significant keywords from the target
         if target_keywords.issubset(job_keywords):
             return True
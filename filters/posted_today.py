@@ -1,7 +1,29 @@
 """Filter for 'Posted Today' jobs — strict calendar-date check."""
 
+import re
 from datetime import datetime, date
 
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Today's date, filled lazily and held until reset_today_cache() so every job
+# in a scan is judged against the same day (even if the run crosses midnight).
+_TODAY_CACHE = {"date": None, "prefix": None}
+
+
+def reset_today_cache():
+    """Forget the cached date; call at the start of each scan run."""
+    _TODAY_CACHE["date"] = None
+    _TODAY_CACHE["prefix"] = None
+
+
+def _today():
+    """Return (date, "YYYY-MM-DD") for today, computed once per cache reset."""
+    if _TODAY_CACHE["date"] is None:
+        today = date.today()
+        _TODAY_CACHE["prefix"] = today.isoformat()
+        _TODAY_CACHE["date"] = today
+    return _TODAY_CACHE["date"], _TODAY_CACHE["prefix"]
+
 
 def is_posted_today(job):
     """
@@ -25,8 +47,15 @@ def is_posted_today(job):
     start_date = job.get("start_date") or job.get("startDate")
     if start_date:
         try:
+            # Workday dates start with YYYY-MM-DD: compare that prefix as a
+            # string and only fall back to a full parse for other formats.
+            today, today_prefix = _today()
+            prefix = start_date[:10]
+            if prefix == today_prefix:
+                return True
+            if _ISO_DATE_RE.match(prefix):
+                return False
             posted_dt = datetime.fromisoformat(start_date)
-            today = date.today()
             return posted_dt.date() == today
         except (ValueError, TypeError):
             pass
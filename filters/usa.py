@@ -37,9 +37,55 @@ MAJOR_US_CITIES = {
     "waltham", "redmond", "sunnyvale", "mountain view", "palo alto",
     "cupertino", "menlo park", "santa clara", "irvine", "boulder",
     "arlington", "bellevue", "cambridge", "herndon", "mclean",
+    "indianapolis",  # needed since needles match whole words ("indiana" no longer covers it)
 }
 
 
+def _trie_pattern(words):
+    """
+    Build a regex alternation factored into a prefix trie, e.g.
+    {"san jose", "san diego"} -> "san\\ (?:jose|diego)".
+
+    The regex engine then tries each prefix once instead of re-scanning it
+    for every needle that shares it — the same idea as an Aho-Corasick
+    automaton, without a C-extension dependency.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-word marker
+
+    def build(node):
+        # Branches keep insertion order. A word that is a prefix of another
+        # ("united states" / "united states of america") becomes a greedy
+        # optional group, and the caller's (?!\w) lookahead backtracks out of
+        # it when the longer form doesn't fit, so order doesn't matter.
+        alts = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not alts:
+            return ""
+        optional = "" in node
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if optional:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+# Every lowercase location needle as one trie-shaped alternation.
+# Lookarounds instead of \b because needles like "u.s." end in punctuation.
+_US_RE = re.compile(
+    r"(?<!\w)(?:"
+    + _trie_pattern(US_STATE_NAMES_LOWER | MAJOR_US_CITIES | US_COUNTRY_KEYWORDS)
+    + r")(?!\w)",
+    re.IGNORECASE,
+)
+# State codes are matched case-sensitively so "in", "or", "me" don't count.
+_US_CODE_RE = re.compile(r"\b(?:" + "|".join(sorted(US_STATE_CODES)) + r")\b")
+
+
 def is_usa_job(job):
     """
     Determine if a job is located in the USA.
@@ -49,7 +95,7 @@ def is_usa_job(job):
     2. country.descriptor contains US keywords
     3. jobRequisitionLocation.country.alpha2Code == "US"
     4. Location text matches US state or major city
-    5. Remote handling: "Remote - USA" counts, bare "Remote" does not
+    5. Remote handling: "Remote - USA" counts (via step 4), bare "Remote" does not
 
     Returns: (is_usa: bool, country_guess: str)
     """
@@ -79,36 +125,22 @@ def is_usa_job(job):
     location_text = (job.get("locations_text", "") or job.get("location", "") or "").strip()
     additional = job.get("additional_locations", []) or job.get("additionalLocations", [])
 
-    all_locations = [location_text] + (additional if isinstance(additional, list) else [])
-    all_text = " ".join(all_locations).lower()
+    # Joined once; both patterns below work on the raw text (_US_RE ignores case)
+    locs = [location_text, *additional] if isinstance(additional, list) else [location_text]
+    raw = " ".join(locs)
 
-    # Check for US country keywords in location text
-    for kw in US_COUNTRY_KEYWORDS:
-        if kw in all_text:
-            return True, "US"
+    # US country keywords, state names and major cities in a single pass
+    if _US_RE.search(raw):
+        return True, "US"
 
     # Check for state codes (2-letter, exact word boundary)
-    words = re.findall(r'\b[A-Z]{2}\b', " ".join(all_locations))
-    for w in words:
-        if w in US_STATE_CODES:
-            return True, "US"
-
-    # Check for state names
-    for state in US_STATE_NAMES_LOWER:
-        if state in all_text:
-            return True, "US"
-
-    # Check for major US cities
-    for city in MAJOR_US_CITIES:
-        if city in all_text:
-            return True, "US"
+    if _US_CODE_RE.search(raw):
+        return True, "US"
 
-    # 4. Remote handling
-    if "remote" in all_text:
-        # "Remote - USA", "Remote USA", "Remote - United States" count
-        if any(kw in all_text for kw in US_COUNTRY_KEYWORDS):
-            return True, "US (Remote)"
-        # Bare "Remote" with no country indicator does NOT count
+    # 4. Remote handling. "Remote - USA" / "Remote - United States" were
+    # already accepted by _US_RE above, so any remote job left here has no
+    # US indicator: bare "Remote" does NOT count.
+    if "remote" in raw.lower():
         return False, "Remote (unknown country)"
 
     return False, "Non-US"
@@ -17,6 +17,66 @@ SECTION_PATTERNS = [
     r"(?i)^(summary|objective|profile|about)",
 ]
 
+# All heading patterns merged into one compiled alternation (one match per line)
+_SECTION_RE = re.compile(
+    "|".join(f"(?:{p.replace('(?i)', '', 1)})" for p in SECTION_PATTERNS),
+    re.IGNORECASE,
+)
+
+# Heading prefix -> normalized section name, checked in order
+_SECTION_NAME_ITEMS = (
+    ("skill", "skills"),
+    ("technical skill", "skills"),
+    ("core competen", "skills"),
+    ("experience", "experience"),
+    ("work experience", "experience"),
+    ("professional experience", "experience"),
+    ("education", "education"),
+    ("academic", "education"),
+    ("project", "projects"),
+    ("personal project", "projects"),
+    ("key project", "projects"),
+    ("certification", "certifications"),
+    ("certificate", "certifications"),
+    ("publication", "publications"),
+    ("paper", "publications"),
+    ("summary", "summary"),
+    ("objective", "summary"),
+    ("profile", "summary"),
+    ("about", "summary"),
+)
+
+
+# Known skills to look for (lowercase)
+KNOWN_SKILLS = [
+    "python", "java", "sql", "matlab", "r", "c++", "javascript",
+    "machine learning", "deep learning", "nlp", "natural language processing",
+    "computer vision", "reinforcement learning", "llm", "llms",
+    "rag", "retrieval augmented generation",
+    "pytorch", "tensorflow", "scikit-learn", "keras", "transformers",
+    "docker", "kubernetes", "aws", "gcp", "azure",
+    "flask", "django", "fastapi",
+    "tableau", "power bi",
+    "git", "github",
+    "pandas", "numpy", "scipy",
+    "signal processing", "time-series", "time series",
+    "cnn", "lstm", "rnn", "bert", "gpt", "transformer",
+    "xgboost", "random forest",
+    "data science", "data engineering", "data analysis",
+    "api", "rest", "microservices",
+]
+
+# One pass over the text finds every skill. Longest first so "deep learning"
+# isn't shadowed by a shorter alternative; lookarounds instead of \b so
+# "c++" works and "r" doesn't match inside "for". An optional plural "s" is
+# captured separately so "APIs" still finds "api".
+_SKILLS_RE = re.compile(
+    r"(?<![\w+])("
+    + "|".join(re.escape(s) for s in sorted(KNOWN_SKILLS, key=len, reverse=True))
+    + r")(s?)(?![\w+])"
+)
+_KNOWN_SKILLS_SET = frozenset(KNOWN_SKILLS)
+
 
 def extract_resume_text(pdf_path):
     """Extract raw text from a PDF resume."""
@@ -39,28 +99,6 @@ def parse_sections(text):
     current_section = "header"
     current_lines = []
 
-    section_names = {
-        "skill": "skills",
-        "technical skill": "skills",
-        "core competen": "skills",
-        "experience": "experience",
-        "work experience": "experience",
-        "professional experience": "experience",
-        "education": "education",
-        "academic": "education",
-        "project": "projects",
-        "personal project": "projects",
-        "key project": "projects",
-        "certification": "certifications",
-        "certificate": "certifications",
-        "publication": "publications",
-        "paper": "publications",
-        "summary": "summary",
-        "objective": "summary",
-        "profile": "summary",
-        "about": "summary",
-    }
-
     for line in lines:
         stripped = line.strip()
         if not stripped:
@@ -68,27 +106,22 @@ def parse_sections(text):
             continue
 
         # Check if this line is a section heading
-        is_heading = False
-        for pattern in SECTION_PATTERNS:
-            if re.match(pattern, stripped):
-                # Save previous section
-                if current_lines:
-                    content = "\n".join(current_lines).strip()
-                    if content:
-                        sections[current_section] = content
-
-                # Determine normalized section name
-                lower = stripped.lower()
-                current_section = "other"
-                for key, name in section_names.items():
-                    if lower.startswith(key):
-                        current_section = name
-                        break
-                current_lines = []
-                is_heading = True
-                break
-
-        if not is_heading:
+        if _SECTION_RE.match(stripped):
+            # Save previous section
+            if current_lines:
+                content = "\n".join(current_lines).strip()
+                if content:
+                    sections[current_section] = content
+
+            # Determine normalized section name
+            lower = stripped.lower()
+            current_section = "other"
+            for key, name in _SECTION_NAME_ITEMS:
+                if lower.startswith(key):
+                    current_section = name
+                    break
+            current_lines = []
+        else:
             current_lines.append(stripped)
 
     # Save last section
@@ -107,34 +140,19 @@ def extract_skills(text, sections=None):
 
     Returns: list of skill strings
     """
-    # Known skills to look for
-    KNOWN_SKILLS = [
-        "python", "java", "sql", "matlab", "r", "c++", "javascript",
-        "machine learning", "deep learning", "nlp", "natural language processing",
-        "computer vision", "reinforcement learning", "llm", "llms",
-        "rag", "retrieval augmented generation",
-        "pytorch", "tensorflow", "scikit-learn", "keras", "transformers",
-        "docker", "kubernetes", "aws", "gcp", "azure",
-        "flask", "django", "fastapi",
-        "tableau", "power bi",
-        "git", "github",
-        "pandas", "numpy", "scipy",
-        "signal processing", "time-series", "time series",
-        "cnn", "lstm", "rnn", "bert", "gpt", "transformer",
-        "xgboost", "random forest",
-        "data science", "data engineering", "data analysis",
-        "api", "rest", "microservices",
-    ]
-
     search_text = ""
     if sections and "skills" in sections:
         search_text = sections["skills"].lower()
     else:
         search_text = text.lower()
 
-    found = []
-    for skill in KNOWN_SKILLS:
-        if skill in search_text:
-            found.append(skill)
+    found = set()
+    for skill, plural in _SKILLS_RE.findall(search_text):
+        found.add(skill)
+        # Report singular and plural forms together ("llms" -> "llm" too)
+        if plural and skill + "s" in _KNOWN_SKILLS_SET:
+            found.add(skill + "s")
+        if skill.endswith("s") and skill[:-1] in _KNOWN_SKILLS_SET:
+            found.add(skill[:-1])
 
-    return sorted(set(found))
+    return sorted(found)
@@ -1,7 +1,11 @@
 """Job-resume matching scorer."""
 
+import os
 import re
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 
 import torch
@@ -11,40 +15,113 @@ logger = logging.getLogger(__name__)
 # ── Lazy-load sentence-transformers to avoid startup cost ───────────
 
 _model = None
+_model_lock = threading.Lock()
+
+# Run the model in FP16 on CUDA (roughly halves memory traffic per forward pass).
+# Set JOBFINDER_HALF_PRECISION=0 to keep FP32. Ignored on CPU.
+HALF_PRECISION = os.environ.get("JOBFINDER_HALF_PRECISION", "1") != "0"
+
+# CPU inference through ONNX Runtime with an INT8-quantized export of the model
+# (shipped in the model's hub repo). Opt in with JOBFINDER_MODEL_BACKEND=onnx;
+# needs `pip install sentence-transformers[onnx]`. Falls back to PyTorch if the
+# backend can't be loaded.
+MODEL_NAME = "all-MiniLM-L6-v2"
+MODEL_BACKEND = os.environ.get("JOBFINDER_MODEL_BACKEND", "torch")
+ONNX_FILE = os.environ.get("JOBFINDER_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+
+# Intra-op threads for CPU inference. Unset keeps PyTorch's default (physical
+# cores). Encodes are serialized by _encode_lock, so one batch at a time gets
+# the whole thread team even when several companies are scored concurrently.
+TORCH_THREADS = int(os.environ.get("JOBFINDER_TORCH_THREADS", 0))
+_encode_lock = threading.Lock()
 
 
 def _get_model():
     global _model
-    if _model is None:
-        logger.info("Loading sentence-transformers model (first time may download ~80MB)...")
-        from sentence_transformers import SentenceTransformer
-        
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Using device: {device}")
-        
-        _model = SentenceTransformer("all-MiniLM-L6-v2", device=device)
-        logger.info("Model loaded.")
+    if _model is not None:
+        return _model
+    # Company scans run in parallel: load once, and let other threads wait
+    # for it instead of each starting their own load.
+    with _model_lock:
+        if _model is None:
+            logger.info("Loading sentence-transformers model (first time may download ~80MB)...")
+            from sentence_transformers import SentenceTransformer
+
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            logger.info(f"Using device: {device}")
+            if device == "cpu":
+                if TORCH_THREADS > 0:
+                    torch.set_num_threads(TORCH_THREADS)
+                try:
+                    torch.set_num_interop_threads(1)
+                except RuntimeError:
+                    pass  # only settable before the first parallel op
+
+            model = None
+            if MODEL_BACKEND == "onnx" and device == "cpu":
+                try:
+                    model = SentenceTransformer(MODEL_NAME, device=device, backend="onnx",
+                                                model_kwargs={"file_name": ONNX_FILE})
+                    logger.info(f"Using ONNX Runtime backend ({ONNX_FILE}).")
+                except Exception as e:
+                    logger.warning(f"ONNX backend unavailable, falling back to PyTorch: {e}")
+
+            if model is None:
+                # Fused scaled_dot_product_attention kernel for the BERT layers
+                try:
+                    model = SentenceTransformer(MODEL_NAME, device=device,
+                                                model_kwargs={"attn_implementation": "sdpa"})
+                except (ValueError, TypeError, ImportError) as e:
+                    logger.warning(f"SDPA attention unavailable, using default attention: {e}")
+                    model = SentenceTransformer(MODEL_NAME, device=device)
+            if device == "cuda" and HALF_PRECISION:
+                model = model.half()
+                logger.info("Using FP16 weights.")
+            _model = model
+            logger.info("Model loaded.")
     return _model
 
 
+# The tokenizer truncates at the model's max_seq_length (256 tokens), which is
+# the real cap on what the model sees. Texts are only pre-cut at this many chars
+# to bound tokenizer work on pathological inputs; normal prose reaches 256
+# tokens long before this.
+EMBED_CHAR_LIMIT = 8000
+
+
 # ── Resume Embedding Cache ──────────────────────────────────────────
 
-_resume_cache = {"text": None, "embedding": None}
+# Small LRU of recent resumes (a user may edit and re-run), keyed on a digest
+# of the encoded text so slots don't hold the text itself.
+RESUME_CACHE_SIZE = 8
+_resume_cache = OrderedDict()  # blake2b digest -> unit embedding
+_resume_cache_lock = threading.Lock()
 
 
 def encode_resume(resume_text):
     """
-    Encode the resume text once and cache it. Returns the embedding vector.
+    Encode the resume text once and cache it. Returns the L2-normalized
+    embedding, so cosine similarity against it is a plain dot product.
     Subsequent calls with the same text return the cached embedding instantly.
     """
-    chunk = resume_text[:2000]
-    if _resume_cache["text"] == chunk and _resume_cache["embedding"] is not None:
-        return _resume_cache["embedding"]
+    chunk = resume_text[:EMBED_CHAR_LIMIT]
+    key = hashlib.blake2b(chunk.encode(), digest_size=16).digest()
+    with _resume_cache_lock:
+        embedding = _resume_cache.get(key)
+        if embedding is not None:
+            _resume_cache.move_to_end(key)
+            return embedding
 
     model = _get_model()
-    embedding = model.encode([chunk])[0]
-    _resume_cache["text"] = chunk
-    _resume_cache["embedding"] = embedding
+    with _encode_lock, torch.inference_mode():
+        embedding = model.encode([chunk])[0]
+    norm = np.linalg.norm(embedding)
+    if norm:
+        embedding = embedding / norm
+    with _resume_cache_lock:
+        _resume_cache[key] = embedding
+        while len(_resume_cache) > RESUME_CACHE_SIZE:
+            _resume_cache.popitem(last=False)
     logger.info("Resume embedding cached.")
     return embedding
 
@@ -72,18 +149,52 @@ def title_score(job_title):
 
 # ── Skill Overlap ───────────────────────────────────────────────────
 
+# Job text is split into tokens on anything but letters, digits and the
+# characters that appear inside skill names ("c++", "c#", "node.js").
+_JD_TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9+#.]+")
+
+
+def _prepare_skills(resume_skills):
+    """
+    Normalize resume skills once: lowercased, de-duplicated, order kept.
+
+    Returns (skill, is_token) pairs. Single-token skills are matched as whole
+    tokens of the job text, so "r" no longer matches any word containing an
+    r. Multi-word or hyphenated skills ("machine learning", "scikit-learn")
+    keep the substring check.
+    """
+    skills = dict.fromkeys(s.lower() for s in resume_skills or ())
+    return tuple((s, _JD_TOKEN_SPLIT_RE.search(s) is None) for s in skills)
+
+
 def skill_overlap_score(resume_skills, job_text):
     """Score 0-1 based on overlap between resume skills and job description."""
-    if not resume_skills:
+    return _skill_overlap_lower(_prepare_skills(resume_skills), job_text.lower())
+
+
+def _skill_overlap_lower(skill_plan, job_lower):
+    """skill_overlap_score() for _prepare_skills() output and lowercased text."""
+    if not skill_plan:
         return 0.0, []
 
-    job_lower = job_text.lower()
-    matched = [s for s in resume_skills if s in job_lower]
+    tokens = None
+    matched = []
+    for skill, is_token in skill_plan:
+        if is_token:
+            if tokens is None:
+                # Trailing dots are sentence punctuation ("python."), not part of the skill
+                tokens = {t.rstrip(".") for t in _JD_TOKEN_SPLIT_RE.split(job_lower)}
+                # Plural mentions ("APIs", "LLMs") also count for the singular skill
+                tokens |= {t[:-1] for t in tokens if len(t) > 2 and t.endswith("s")}
+            if skill in tokens:
+                matched.append(skill)
+        elif skill in job_lower:
+            matched.append(skill)
 
     if not matched:
         return 0.0, matched
 
-    score = len(matched) / len(resume_skills)
+    score = len(matched) / len(skill_plan)
     return min(score, 1.0), matched
 
 
@@ -92,16 +203,15 @@ def skill_overlap_score(resume_skills, job_text):
 def semantic_similarity(resume_text, job_text):
     """Cosine similarity between resume and job embeddings."""
     try:
+        # The resume embedding comes from the cache (unit-normalized), so
+        # only the job text is encoded per call.
+        resume_emb = encode_resume(resume_text)
         model = _get_model()
-        # Truncate texts to avoid memory issues (model handles ~256 tokens)
-        resume_chunk = resume_text[:2000]
-        job_chunk = job_text[:2000]
-
-        embeddings = model.encode([resume_chunk, job_chunk])
-        cos_sim = np.dot(embeddings[0], embeddings[1]) / (
-            np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-        )
-        return float(max(0, cos_sim))  # Clamp to non-negative
+        job_chunk = job_text[:EMBED_CHAR_LIMIT]
+
+        with _encode_lock, torch.inference_mode():
+            job_emb = model.encode([job_chunk], convert_to_numpy=True, normalize_embeddings=True)[0]
+        return max(0.0, float(np.dot(resume_emb, job_emb)))  # Clamp to non-negative
     except Exception as e:
         logger.error(f"Semantic similarity error: {e}")
         return 0.0
@@ -168,10 +278,16 @@ def score_job(job_title, job_description, resume_text, resume_skills):
 
 # ── Batch Scoring ───────────────────────────────────────────────────
 
-BATCH_SIZE = 32  # encode this many job texts at once
+BATCH_SIZE = 32  # texts per forward pass inside model.encode
 
+# Jobs whose best possible score (perfect semantic match plus their title and
+# skill scores) is below this are not encoded; their semantic score is 0.0.
+# The ceiling is never below WEIGHTS["semantic"], so values up to that skip
+# nothing. Disabled (0.0) by default; set JOBFINDER_MIN_PLAUSIBLE_SCORE to enable.
+MIN_PLAUSIBLE_SCORE = float(os.environ.get("JOBFINDER_MIN_PLAUSIBLE_SCORE", 0.0))
 
-def score_jobs_batch(jobs, resume_text, resume_skills):
+
+def score_jobs_batch(titles, jd_texts, resume_text, resume_skills):
     """
     Score multiple jobs against a resume in batch.
     Much faster than calling score_job() in a loop because:
@@ -179,59 +295,89 @@ def score_jobs_batch(jobs, resume_text, resume_skills):
     2. Job text embeddings are batch-encoded
 
     Args:
-        jobs: list of dicts with "title" and "jd_text" keys
+        titles: list of job title strings
+        jd_texts: list of job description strings, parallel to titles
         resume_text: the resume plain text
         resume_skills: list of skill strings
 
     Returns: list of score result dicts (same format as score_job)
     """
-    if not jobs:
+    if not titles:
         return []
 
+    skill_plan = _prepare_skills(resume_skills)
+
     try:
         model = _get_model()
         resume_emb = encode_resume(resume_text)
-        resume_norm = np.linalg.norm(resume_emb)
     except Exception as e:
         logger.error(f"Batch scoring model error: {e}")
         # Fallback: score individually without semantic
         results = []
-        for job in jobs:
-            job_text = f"{job['title']}\n{job.get('jd_text', '')}"
-            t_score, t_matches = title_score(job["title"])
-            s_score, s_matches = skill_overlap_score(resume_skills, job_text)
+        for title, jd_text in zip(titles, jd_texts):
+            job_lower = f"{title}\n{jd_text}".lower()
+            t_score, t_matches = title_score(title)
+            s_score, s_matches = _skill_overlap_lower(skill_plan, job_lower)
             results.append(_build_result(t_score, t_matches, s_score, s_matches, 0.0))
         return results
 
-    # Pre-compute title and skill scores (cheap, no model needed)
+    # Pre-compute title and skill scores (cheap, no model needed).
+    # The same role is often listed once per location, so results are
+    # memoized per call on the lowercased title / job text.
     title_results = []
     skill_results = []
     job_texts = []
-    for job in jobs:
-        job_text = f"{job['title']}\n{job.get('jd_text', '')}"
-        job_texts.append(job_text[:2000])
-        title_results.append(title_score(job["title"]))
-        skill_results.append(skill_overlap_score(resume_skills, job_text))
-
-    # Batch encode all job texts
-    all_sem_scores = []
-    for i in range(0, len(job_texts), BATCH_SIZE):
-        batch = job_texts[i : i + BATCH_SIZE]
+    title_memo = {}
+    skill_memo = {}
+    for title, jd_text in zip(titles, jd_texts):
+        # Lowercased once for both uses. The model's tokenizer is uncased, so
+        # the embedding is unaffected; skills still see the full description.
+        job_lower = f"{title}\n{jd_text}".lower()
+        job_texts.append(job_lower[:EMBED_CHAR_LIMIT])
+
+        title_key = title.lower()
+        t_result = title_memo.get(title_key)
+        if t_result is None:
+            t_result = title_memo[title_key] = title_score(title)
+        title_results.append(t_result)
+
+        s_result = skill_memo.get(job_lower)
+        if s_result is None:
+            s_result = skill_memo[job_lower] = _skill_overlap_lower(skill_plan, job_lower)
+        skill_results.append(s_result)
+
+    # Only encode jobs that could still reach MIN_PLAUSIBLE_SCORE
+    all_sem_scores = [0.0] * len(job_texts)
+    keep_idx = [
+        i for i, ((t_score, _), (s_score, _)) in enumerate(zip(title_results, skill_results))
+        if WEIGHTS["semantic"] + WEIGHTS["title"] * t_score + WEIGHTS["skills"] * s_score
+        >= MIN_PLAUSIBLE_SCORE
+    ]
+    if len(keep_idx) < len(job_texts):
+        logger.info(f"Skipping semantic encoding for {len(job_texts) - len(keep_idx)} "
+                    f"jobs below MIN_PLAUSIBLE_SCORE={MIN_PLAUSIBLE_SCORE}")
+
+    # One encode call for every kept job: SentenceTransformer length-sorts the
+    # texts internally (so batches carry little padding) and returns unit
+    # vectors, making cosine similarity a single matvec against the resume.
+    if keep_idx:
         try:
-            job_embeddings = model.encode(batch, show_progress_bar=False)
-            for emb in job_embeddings:
-                cos_sim = np.dot(resume_emb, emb) / (resume_norm * np.linalg.norm(emb))
-                all_sem_scores.append(float(max(0, cos_sim)))
+            with _encode_lock, torch.inference_mode():
+                job_embeddings = model.encode([job_texts[i] for i in keep_idx],
+                                              batch_size=BATCH_SIZE, show_progress_bar=False,
+                                              convert_to_numpy=True, normalize_embeddings=True)
+            sims = np.maximum(job_embeddings @ resume_emb, 0.0).tolist()
+            for i, sim in zip(keep_idx, sims):
+                all_sem_scores[i] = sim
         except Exception as e:
-            logger.error(f"Batch encode error at offset {i}: {e}")
-            all_sem_scores.extend([0.0] * len(batch))
+            logger.error(f"Batch encode error: {e}")
 
     # Assemble results
     results = []
-    for idx in range(len(jobs)):
+    for idx in range(len(titles)):
         t_score, t_matches = title_results[idx]
         s_score, s_matches = skill_results[idx]
-        sem_score = all_sem_scores[idx] if idx < len(all_sem_scores) else 0.0
+        sem_score = all_sem_scores[idx]
         results.append(_build_result(t_score, t_matches, s_score, s_matches, sem_score))
 
     return results
@@ -3,6 +3,7 @@
 import os
 import re
 import logging
+from itertools import chain, islice
 from openpyxl import Workbook, load_workbook
 
 logger = logging.getLogger(__name__)
@@ -52,15 +53,18 @@ def import_companies(file_path):
     if "workday_url" not in headers:
         raise ValueError("Spreadsheet must have a 'workday_careers_url' or 'Careers site' column")
 
+    # Only recognized columns are read; rows too short for a column leave it unset.
+    # Blank rows need no separate check: they fail the required-field test below.
+    header_slots = [(i, h) for i, h in enumerate(headers) if h]
+
     companies = []
     for row in ws.iter_rows(min_row=2, values_only=True):
-        if not row or not any(row):
-            continue
-
+        row_len = len(row)
         record = {}
-        for i, val in enumerate(row):
-            if i < len(headers) and headers[i]:
-                record[headers[i]] = str(val).strip() if val else None
+        for i, name in header_slots:
+            if i < row_len:
+                val = row[i]
+                record[name] = str(val).strip() if val else None
 
         if record.get("company_name") and record.get("workday_url"):
             # Generate a stable company_id from the name
@@ -72,55 +76,73 @@ def import_companies(file_path):
     return companies
 
 
+# Write-only mode needs column widths before the first row is streamed, so
+# they are sized from the header and the first WIDTH_SAMPLE_ROWS rows.
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 60
+
+EXPORT_COLUMNS = ["Company", "Title", "Location", "Posted", "Job Link", "Match Score", "Why Matched"]
+
+
+def _export_row(job):
+    """Cell values for one job, in EXPORT_COLUMNS order."""
+    return [
+        job.get("company_name", ""),
+        job.get("title", ""),
+        job.get("locations_text", ""),
+        job.get("posted_label", ""),
+        job.get("job_url", ""),
+        job.get("match_score", 0),
+        job.get("matched_keywords", ""),
+    ]
+
+
 def export_results(jobs, file_path):
     """
     Export job results to an xlsx file.
 
+    Streams rows through a write-only workbook, so jobs may be any iterable
+    (e.g. database.iter_results) and memory stays flat regardless of size.
+
     Columns: Company, Title, Location, Posted, Job Link, Match Score, Why Matched
     """
-    wb = Workbook()
-    ws = wb.active
-    if ws is None:
-        raise ValueError("Could not create worksheet")
-    ws.title = "Job Results"
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
 
-    # Headers
-    headers = ["Company", "Title", "Location", "Posted", "Job Link", "Match Score", "Why Matched"]
-    ws.append(headers)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Job Results")
 
-    # Style headers
-    from openpyxl.styles import Font, PatternFill
+    rows = (_export_row(job) for job in jobs)
+    sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+
+    # Column widths from the header and the sampled rows, in one pass
+    col_max = [len(header) for header in EXPORT_COLUMNS]
+    for row in sample:
+        for ci, val in enumerate(row):
+            length = len(str(val)) if val is not None else 0
+            if length > col_max[ci]:
+                col_max[ci] = length
+    for ci, length in enumerate(col_max):
+        ws.column_dimensions[get_column_letter(ci + 1)].width = min(length + 2, MAX_COLUMN_WIDTH)
+
+    # Styled header row
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="2D3748", end_color="2D3748", fill_type="solid")
-    for cell in ws[1]:
+    header_cells = []
+    for header in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.font = header_font
         cell.fill = header_fill
+        header_cells.append(cell)
+    ws.append(header_cells)
 
     # Data rows
-    for job in jobs:
-        ws.append([
-            job.get("company_name", ""),
-            job.get("title", ""),
-            job.get("locations_text", ""),
-            job.get("posted_label", ""),
-            job.get("job_url", ""),
-            job.get("match_score", 0),
-            job.get("matched_keywords", ""),
-        ])
-
-    # Auto-width columns
-    from openpyxl.utils import get_column_letter
-    for col_idx, col_cells in enumerate(ws.columns, start=1):
-        max_len = 0
-        for cell in col_cells:
-            try:
-                if cell.value:
-                    max_len = max(max_len, len(str(cell.value)))
-            except Exception:
-                pass
-        col_letter = get_column_letter(col_idx)
-        ws.column_dimensions[col_letter].width = min(max_len + 2, 60)
+    count = 0
+    for row in chain(sample, rows):
+        ws.append(row)
+        count += 1
 
     wb.save(file_path)
-    logger.info(f"Exported {len(jobs)} jobs to {file_path}")
+    logger.info(f"Exported {count} jobs to {file_path}")
     return file_path